@@ -0,0 +1,200 @@
+import itertools as it
+import os
+
+import numpy as np
+from manim import Camera, Mobject, VMobject
+
+# Set DIRTY_REGION_VERIFY=1 to also do a full render of every frame and check both give the same pixels
+VERIFY = os.environ.get("DIRTY_REGION_VERIFY") == "1"
+
+# Past this fraction of the frame, redrawing the dirty region costs about as much as a full render
+MAX_DIRTY_FRACTION = 0.5
+
+# Pixels added around a mobject's bounding box for antialiasing
+ANTIALIAS_MARGIN = 2
+
+
+class DirtyRegionCamera(Camera):
+    """
+    Camera that only re-rasterizes the parts of the frame that changed since the last one.
+
+    The renderer resets the frame to its background before every capture. If the background and the
+    mobjects are the same as the last frame apart from a few changed ones, only the region covered by
+    those mobjects (before and after the change) is restored from the background and redrawn,
+    clipped to that region. Everything else is kept from the previous frame.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.last_background = None
+        self.pending_background = None
+        self.last_mobjects = None
+        self.verify_array = None
+        # Number of frames drawn through the clipped path, for checking it actually gets used
+        self.clipped_frames = 0
+        super().__init__(*args, **kwargs)
+
+    # Resetting is deferred to capture_mobjects, which knows how much of the frame actually needs it
+    def reset(self):
+        if not hasattr(self, "pixel_array"):
+            return super().reset()
+        self.pending_background = self.background
+        return self
+
+    def set_frame_to_background(self, background):
+        if not hasattr(self, "pixel_array"):
+            return super().set_frame_to_background(background)
+        self.pending_background = background
+
+    def capture_mobjects(self, mobjects, **kwargs):
+        # Mobjects like ValueTrackers have points but draw nothing, so they can't make anything dirty
+        mobjects = [
+            mob for mob in self.get_mobjects_to_display(mobjects, **kwargs) if self.type_or_raise(mob) is not Mobject
+        ]
+        background = self.pending_background
+        self.pending_background = None
+
+        current = {id(mob): (self.fingerprint(mob), self.pixel_bounds(mob)) for mob in mobjects}
+        region = None
+        if background is not None and background is self.last_background:
+            region = self.dirty_region(mobjects, current)
+
+        if region is None:
+            if background is not None:
+                self.set_pixel_array(background)
+            self.draw(mobjects, self.pixel_array)
+        elif region != ():
+            self.draw_region(mobjects, current, background, region)
+
+        if VERIFY and background is not None:
+            self.verify(mobjects, background)
+
+        self.last_background = background
+        self.last_mobjects = [(id(mob), *current[id(mob)]) for mob in mobjects]
+
+    def draw(self, mobjects, pixel_array: np.ndarray):
+        for group_type, group in it.groupby(mobjects, self.type_or_raise):
+            self.display_funcs[group_type](list(group), pixel_array)
+
+    # Returns the pixel rectangle to redraw, () if nothing changed, or None if the whole frame has to be redrawn
+    def dirty_region(self, mobjects, current: dict):
+        if self.last_mobjects is None:
+            return None
+
+        # Image and point cloud mobjects are composited over the whole frame, so they can't be clipped
+        if any(self.type_or_raise(mob) is not VMobject or mob.get_background_image() is not None for mob in mobjects):
+            return None
+
+        previous = {mob_id: (fingerprint, bounds) for mob_id, fingerprint, bounds in self.last_mobjects}
+
+        # Mobjects present in both frames must still be drawn in the same order
+        kept_before = [mob_id for mob_id, _, _ in self.last_mobjects if mob_id in current]
+        kept_now = [id(mob) for mob in mobjects if id(mob) in previous]
+        if kept_before != kept_now:
+            return None
+
+        changed = []
+        for mob_id, (fingerprint, bounds) in current.items():
+            if mob_id not in previous:
+                changed.append(bounds)
+            elif previous[mob_id][0] != fingerprint:
+                changed.extend([previous[mob_id][1], bounds])
+        changed.extend(bounds for mob_id, (_, bounds) in previous.items() if mob_id not in current)
+
+        changed = [bounds for bounds in changed if bounds is not None]
+        if not changed:
+            return ()
+
+        x0 = max(min(bounds[0] for bounds in changed), 0)
+        y0 = max(min(bounds[1] for bounds in changed), 0)
+        x1 = min(max(bounds[2] for bounds in changed), self.pixel_width)
+        y1 = min(max(bounds[3] for bounds in changed), self.pixel_height)
+
+        if x0 >= x1 or y0 >= y1:
+            return ()
+        if (x1 - x0) * (y1 - y0) > MAX_DIRTY_FRACTION * self.pixel_width * self.pixel_height:
+            return None
+
+        return x0, y0, x1, y1
+
+    def draw_region(self, mobjects, current: dict, background: np.ndarray, region: tuple):
+        x0, y0, x1, y1 = region
+        visible = [mob for mob in mobjects if self.overlaps(current[id(mob)][1], region)]
+        self.pixel_array[y0:y1, x0:x1] = background[y0:y1, x0:x1]
+        self.clipped_frames += 1
+
+        ctx = self.get_cairo_context(self.pixel_array)
+        ctx.save()
+        matrix = ctx.get_matrix()
+        ctx.identity_matrix()
+        ctx.rectangle(x0, y0, x1 - x0, y1 - y0)
+        ctx.clip()
+        ctx.set_matrix(matrix)
+        try:
+            self.draw(visible, self.pixel_array)
+        finally:
+            ctx.restore()
+
+    def verify(self, mobjects, background: np.ndarray):
+        # Reused between frames, since cairo contexts are cached by the id of the array they draw on
+        if self.verify_array is None or self.verify_array.shape != self.pixel_array.shape:
+            self.verify_array = np.zeros_like(self.pixel_array)
+
+        self.verify_array[:] = background
+        self.draw(mobjects, self.verify_array)
+
+        if not np.array_equal(self.verify_array, self.pixel_array):
+            differing = np.argwhere(np.any(self.verify_array != self.pixel_array, axis=-1))
+            raise AssertionError(
+                f"Dirty region render differs from full render in {len(differing)} pixels, "
+                f"first at (x={differing[0][1]}, y={differing[0][0]})"
+            )
+
+    def fingerprint(self, mob) -> int:
+        parts = [id(type(mob)), mob.points.tobytes(), getattr(mob, "z_index", 0)]
+
+        # Other mobject types always take the full render path, so only vectorized ones need their style
+        if isinstance(mob, VMobject):
+            parts.extend([
+                mob.get_fill_rgbas().tobytes(),
+                mob.get_stroke_rgbas().tobytes(),
+                mob.get_stroke_rgbas(background=True).tobytes(),
+                mob.get_stroke_width(),
+                mob.get_stroke_width(background=True),
+                mob.get_sheen_factor(),
+                np.asarray(mob.get_sheen_direction()).tobytes(),
+                getattr(mob, "joint_type", None),
+                getattr(mob, "cap_style", None),
+                mob.get_background_image(),
+            ])
+
+        return hash(tuple(parts))
+
+    # Conservative pixel bounding box (x0, y0, x1, y1) of everything the mobject draws
+    def pixel_bounds(self, mob):
+        points = mob.points
+        if len(points) == 0:
+            return None
+
+        margin = ANTIALIAS_MARGIN
+        if isinstance(mob, VMobject):
+            width = max(mob.get_stroke_width(), mob.get_stroke_width(background=True))
+            # Stroke widths are in hundredths of a frame unit, and miter joins can reach 5 widths out
+            margin += 5 * width * self.cairo_line_width_multiple * self.pixel_width / self.frame_width
+
+        x_scale = self.pixel_width / self.frame_width
+        y_scale = self.pixel_height / self.frame_height
+        xs = (points[:, 0] - self.frame_center[0]) * x_scale + self.pixel_width / 2
+        ys = (self.frame_center[1] - points[:, 1]) * y_scale + self.pixel_height / 2
+
+        return (
+            int(np.floor(xs.min() - margin)),
+            int(np.floor(ys.min() - margin)),
+            int(np.ceil(xs.max() + margin)) + 1,
+            int(np.ceil(ys.max() + margin)) + 1,
+        )
+
+    @staticmethod
+    def overlaps(bounds, region: tuple) -> bool:
+        if bounds is None:
+            return False
+        return bounds[0] < region[2] and region[0] < bounds[2] and bounds[1] < region[3] and region[1] < bounds[3]
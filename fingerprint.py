@@ -0,0 +1,68 @@
+import ast
+import hashlib
+from pathlib import Path
+
+
+def digest_file(path: Path) -> str:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return "missing"
+
+
+# Computes a fingerprint for each section out of the code it runs and the images it loads.
+# Formatting and comment changes don't change the AST dump, so they don't cause re-renders.
+def section_fingerprints(source: Path, sections: tuple) -> dict:
+    tree = ast.parse(source.read_text(encoding="utf-8"))
+    methods = {}
+    shared = []
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "MainScene":
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name != "construct":
+                    methods[item.name] = item
+                else:
+                    shared.append(ast.dump(item))
+        else:
+            shared.append(ast.dump(node))
+
+    def dependencies(name: str) -> set:
+        found = set()
+        pending = [name]
+
+        while pending:
+            current = pending.pop()
+            if current in found or current not in methods:
+                continue
+            found.add(current)
+
+            for node in ast.walk(methods[current]):
+                if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "self":
+                    pending.append(node.attr)
+
+        return found
+
+    section_dependencies = {section: dependencies(section) for section in sections}
+    reached = set().union(*section_dependencies.values())
+    shared.extend(ast.dump(method) for name, method in methods.items() if name not in reached)
+
+    # Anything outside the section methods (imports, construct, __init__) affects every section
+    shared_digest = hashlib.sha1("\n".join(shared).encode()).hexdigest()
+
+    fingerprints = {}
+
+    for section in sections:
+        sha = hashlib.sha1(shared_digest.encode())
+
+        for name in sorted(section_dependencies[section]):
+            sha.update(ast.dump(methods[name]).encode())
+
+            for node in ast.walk(methods[name]):
+                if isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.startswith("images/"):
+                    # Image paths are relative to the directory main.py is rendered from
+                    sha.update(digest_file(source.parent / node.value).encode())
+
+        fingerprints[section] = sha.hexdigest()
+
+    return fingerprints
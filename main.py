@@ -3,21 +3,90 @@ from manim import *
 from manim_voiceover import VoiceoverScene
 from manim_voiceover.services.gtts import GTTSService
 import numpy as np
+import os
+from pathlib import Path
+from pydub import AudioSegment
+
+from dirty_region import DirtyRegionCamera
+from streaming import SectionStreamer
+
+
+# Sections of the video, in the order construct plays them
+SECTIONS = (
+    "play_introduction_scene",
+    "play_pedestrian_graph_scene",
+    "play_roadside_tree_scene",
+    "play_site_visit_scene",
+    "play_conclusion_scene",
+    "show_credits",
+)
 
 
 class MainScene(VoiceoverScene):
+    # Set by watch.py to reuse an already loaded speech service and to only render the sections that changed
+    preloaded_speech_service = None
+    sections = None
+    # Directory to also write the video to as an HLS stream while it renders, see streaming.py
+    stream_dir = os.environ.get("STREAM_DIR")
+
+    # Only re-rasterizes the parts of each frame that changed, see dirty_region.py
+    def __init__(self, camera_class=DirtyRegionCamera, **kwargs):
+        super().__init__(camera_class=camera_class, **kwargs)
 
     def add_voiceover_ssml(self, ssml: str, **kwargs) -> None:
         pass
 
     def construct(self):
-        self.set_speech_service(GTTSService(transcription_model="base"))
-        self.play_introduction_scene()
-        self.play_pedestrian_graph_scene()
-        self.play_roadside_tree_scene()
-        self.play_site_visit_scene()
-        self.play_conclusion_scene()
-        self.show_credits()
+        self.set_speech_service(self.preloaded_speech_service or GTTSService(transcription_model="base"))
+
+        # Start and end time of every section that was rendered
+        self.section_times = {}
+
+        sections = SECTIONS
+        if self.sections is not None:
+            # Sections after the last one being rendered can't affect it, so they don't need to run at all
+            sections = SECTIONS[:max(SECTIONS.index(section) for section in self.sections) + 1]
+
+        self.streamer = None
+        if self.stream_dir:
+            rendering = SECTIONS if self.sections is None else self.sections
+            self.streamer = SectionStreamer(Path(self.stream_dir), SECTIONS, rendering)
+
+        try:
+            for section in sections:
+                skip = self.sections is not None and section not in self.sections
+                # Skipped sections still run so the scene is in the right state for the ones after them
+                self.next_section(section, skip_animations=skip)
+                start = self.renderer.time
+                getattr(self, section)()
+
+                if not skip:
+                    self.section_times[section] = (start, self.renderer.time)
+
+                if self.streamer is not None and not skip:
+                    self.stream_section(section)
+        finally:
+            # Ends the playlist even when a section fails, otherwise players would keep waiting for more
+            if self.streamer is not None:
+                self.streamer.close()
+
+    # The voiceover audio of a rendered section, padded with silence to the section's length
+    def section_audio(self, section: str):
+        file_writer = self.renderer.file_writer
+        if not file_writer.includes_sound:
+            return None
+
+        start, end = self.section_times[section]
+        audio = file_writer.audio_segment[int(start * 1000):int(end * 1000)]
+        missing = (end - start) * 1000 - len(audio)
+        if missing > 0:
+            audio += AudioSegment.silent(duration=missing, frame_rate=audio.frame_rate)
+
+        return audio
+
+    def stream_section(self, section: str):
+        partial_movie_files = self.renderer.file_writer.sections[-1].partial_movie_files
+        self.streamer.write_section(section, partial_movie_files, self.section_audio(section))
 
     def make_title(self, text: str, duration: float):
         title = Tex(text, font_size=64)
@@ -0,0 +1,186 @@
+import math
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Length of each segment in seconds, the last segment of a section may be shorter
+SEGMENT_LENGTH = 4
+
+# Older playlists (and the segments only they use) are deleted once there are more than this many
+KEEP_PLAYLISTS = 2
+
+PLAYLIST_PATTERN = re.compile(r"MainScene_(\d+)\.m3u8")
+
+
+def find_ffmpeg() -> str:
+    path = shutil.which("ffmpeg")
+    if path is None:
+        raise RuntimeError("ffmpeg was not found on the PATH, it's needed to write the stream and preview videos")
+    return path
+
+
+class SectionStreamer:
+    """
+    Writes the video as an HLS stream while it renders, one directory of segments per section.
+
+    Each finished section is encoded into its own segments in the background, and the playlist is
+    extended with it. Sections always start on a new segment, so re-rendering one section only adds
+    segments to its own directory. Every render writes a new playlist, since players won't pick up
+    changes to the middle of one they already loaded.
+    """
+
+    def __init__(self, output_dir: Path, sections: tuple, rendering: set, segment_length: float = SEGMENT_LENGTH):
+        self.output_dir = output_dir
+        self.sections = sections
+        self.segment_length = segment_length
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Sections being rendered are left out of the playlist until their new segments are written
+        self.rendering = set(rendering)
+
+        self.version = max(self.playlist_versions(), default=0) + 1
+        self.playlist = self.output_dir / f"MainScene_{self.version}.m3u8"
+
+        # A single worker keeps sections in order while letting the next one render during encoding
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+
+    def playlist_versions(self) -> list:
+        names = [path.name for path in self.output_dir.iterdir()]
+        return sorted(int(match.group(1)) for match in map(PLAYLIST_PATTERN.fullmatch, names) if match)
+
+    def section_dir(self, name: str) -> Path:
+        return self.output_dir / f"{self.sections.index(name):02d}_{name}"
+
+    def write_section(self, name: str, partial_movie_files: list, audio):
+        # Raises the error of a failed encode now rather than after the whole render
+        for future in self.pending:
+            if future.done():
+                future.result()
+
+        work_dir = Path(tempfile.mkdtemp(prefix=f"{name}_"))
+
+        # Audio keeps growing as the scene renders, so the section's slice is saved before returning
+        audio_file = None
+        if audio is not None:
+            audio_file = work_dir / "audio.wav"
+            audio.export(audio_file, format="wav")
+
+        files = [str(Path(file).resolve()) for file in partial_movie_files if file is not None]
+        self.pending.append(self.executor.submit(self.encode, name, files, audio_file, work_dir))
+
+    def encode(self, name: str, partial_movie_files: list, audio_file: Path, work_dir: Path):
+        try:
+            if partial_movie_files:
+                self.encode_segments(name, partial_movie_files, audio_file, work_dir)
+            else:
+                # Nothing was played in the section, so it's left out of the stream rather than showing old segments
+                (self.section_dir(name) / "index.m3u8").unlink(missing_ok=True)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.rendering.discard(name)
+        self.write_playlist(finished=False)
+
+    def encode_segments(self, name: str, partial_movie_files: list, audio_file: Path, work_dir: Path):
+        concat_list = work_dir / "concat.txt"
+        concat_list.write_text(
+            "".join("file '{}'\n".format(file.replace("'", "'\\''")) for file in partial_movie_files),
+            encoding="utf-8"
+        )
+
+        segments_dir = work_dir / "segments"
+        segments_dir.mkdir()
+
+        command = [find_ffmpeg(), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", str(concat_list)]
+        if audio_file is not None:
+            command += ["-i", str(audio_file), "-map", "0:v", "-map", "1:a", "-c:a", "aac"]
+        command += [
+            "-c:v", "libx264",
+            "-pix_fmt", "yuv420p",
+            # Keyframes on every segment boundary, so segments are all the same length
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_length})",
+            "-f", "hls",
+            "-hls_time", str(self.segment_length),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_filename", str(segments_dir / f"v{self.version}_%03d.ts"),
+            str(segments_dir / "index.m3u8"),
+        ]
+        subprocess.run(command, check=True)
+
+        # Segments are named after the render, so they go next to the ones older playlists still use
+        section_dir = self.section_dir(name)
+        section_dir.mkdir(exist_ok=True)
+        for segment in segments_dir.glob("*.ts"):
+            shutil.move(str(segment), section_dir / segment.name)
+        shutil.move(str(segments_dir / "index.m3u8"), section_dir / "index.m3u8")
+
+    # Rebuilds the playlist out of every section that is ready, stopping at the first one still being rendered,
+    # so while rendering the playlist only ever grows at the end
+    def write_playlist(self, finished: bool):
+        entries = []
+        target_duration = self.segment_length
+
+        for name in self.sections:
+            if name in self.rendering:
+                break
+
+            # Sections that were never rendered, or played nothing, aren't part of the stream
+            section_playlist = self.section_dir(name) / "index.m3u8"
+            if not section_playlist.exists():
+                continue
+
+            # Encoder settings can differ between renders of different sections
+            if entries:
+                entries.append("#EXT-X-DISCONTINUITY")
+
+            for line in section_playlist.read_text(encoding="utf-8").splitlines():
+                if line.startswith("#EXTINF:"):
+                    target_duration = max(target_duration, float(line[len("#EXTINF:"):].split(",")[0]))
+                    entries.append(line)
+                elif line and not line.startswith("#"):
+                    entries.append(f"{self.section_dir(name).name}/{line}")
+
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{math.ceil(target_duration)}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            # Tells players to start from the beginning rather than near the end, like they would for a live stream
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            *entries,
+        ]
+        if finished:
+            lines.append("#EXT-X-ENDLIST")
+
+        # Written next to the playlist then moved over it, so players never read half a file
+        temporary = self.playlist.with_suffix(".tmp")
+        temporary.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        temporary.replace(self.playlist)
+
+    # Deletes all but the newest playlists, along with the segments none of the remaining ones use
+    def remove_old_playlists(self):
+        versions = self.playlist_versions()
+        for version in versions[:-KEEP_PLAYLISTS]:
+            (self.output_dir / f"MainScene_{version}.m3u8").unlink()
+
+        used = set()
+        for version in versions[-KEEP_PLAYLISTS:]:
+            playlist = self.output_dir / f"MainScene_{version}.m3u8"
+            used.update(line for line in playlist.read_text(encoding="utf-8").splitlines() if not line.startswith("#"))
+
+        for segment in self.output_dir.glob("*/*.ts"):
+            if segment.relative_to(self.output_dir).as_posix() not in used:
+                segment.unlink()
+
+    # Ends the playlist with the sections that finished, also when the render failed part way
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.write_playlist(finished=True)
+        self.remove_old_playlists()
+
+        for future in self.pending:
+            future.result()
@@ -0,0 +1,38 @@
+import pytest
+
+manim = pytest.importorskip("manim")
+
+import dirty_region
+from dirty_region import DirtyRegionCamera
+
+
+class UpdaterScene(manim.Scene):
+    def construct(self):
+        tracker = manim.ValueTracker(0)
+
+        dot = manim.Dot(color=manim.YELLOW)
+        dot.add_updater(lambda this: this.move_to([tracker.get_value(), 0, 0]))
+
+        number = manim.DecimalNumber(0, num_decimal_places=2).to_corner(manim.UL)
+        number.add_updater(lambda this: this.set_value(tracker.get_value()))
+
+        self.add(manim.Square(side_length=3), dot, number)
+        self.play(tracker.animate.set_value(2), run_time=1)
+
+
+def test_dirty_region_matches_full_render(monkeypatch, tmp_path):
+    # Every frame is also rendered in full, and the camera raises if any pixel differs
+    monkeypatch.setattr(dirty_region, "VERIFY", True)
+
+    with manim.tempconfig({
+        "quality": "low_quality",
+        "media_dir": str(tmp_path),
+        "write_to_movie": False,
+        "save_last_frame": False,
+        "disable_caching": True,
+        "preview": False,
+    }):
+        scene = UpdaterScene(camera_class=DirtyRegionCamera)
+        scene.render()
+
+    assert scene.renderer.camera.clipped_frames > 0
@@ -0,0 +1,81 @@
+from fingerprint import section_fingerprints
+
+SECTIONS = ("play_intro", "play_trees", "play_photos")
+
+SOURCE = '''from manim import *
+
+
+class MainScene(Scene):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    def construct(self):
+        for section in SECTIONS:
+            getattr(self, section)()
+
+    def make_title(self, text: str):
+        self.play(Write(Tex(text)))
+
+    def create_tree(self):
+        return Circle()
+
+    def play_intro(self):
+        self.make_title("Intro")
+
+    def play_trees(self):
+        self.make_title("Trees")
+        self.add(self.create_tree())
+
+    def play_photos(self):
+        self.add(ImageMobject("images/photo.png"))
+'''
+
+
+def fingerprints_of(tmp_path, source: str) -> dict:
+    path = tmp_path / "main.py"
+    path.write_text(source, encoding="utf-8")
+    return section_fingerprints(path, SECTIONS)
+
+
+def changed_sections(before: dict, after: dict) -> set:
+    return {section for section in SECTIONS if before[section] != after[section]}
+
+
+def test_formatting_changes_nothing(tmp_path):
+    before = fingerprints_of(tmp_path, SOURCE)
+    after = fingerprints_of(
+        tmp_path,
+        SOURCE.replace('self.make_title("Intro")', '# Opening title\n        self.make_title( "Intro" )')
+    )
+
+    assert changed_sections(before, after) == set()
+
+
+def test_helper_change_invalidates_its_callers(tmp_path):
+    before = fingerprints_of(tmp_path, SOURCE)
+
+    after = fingerprints_of(tmp_path, SOURCE.replace("Write(Tex(text))", "FadeIn(Tex(text))"))
+    assert changed_sections(before, after) == {"play_intro", "play_trees"}
+
+    after = fingerprints_of(tmp_path, SOURCE.replace("return Circle()", "return Square()"))
+    assert changed_sections(before, after) == {"play_trees"}
+
+
+def test_image_change_invalidates_its_section(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "photo.png").write_bytes(b"before")
+    before = fingerprints_of(tmp_path, SOURCE)
+
+    (tmp_path / "images" / "photo.png").write_bytes(b"after")
+    after = fingerprints_of(tmp_path, SOURCE)
+
+    assert changed_sections(before, after) == {"play_photos"}
+
+
+def test_unreached_method_change_invalidates_everything(tmp_path):
+    before = fingerprints_of(tmp_path, SOURCE)
+    after = fingerprints_of(
+        tmp_path, SOURCE.replace("super().__init__(**kwargs)", "super().__init__(camera_class=Camera, **kwargs)")
+    )
+
+    assert changed_sections(before, after) == set(SECTIONS)
@@ -0,0 +1,110 @@
+from streaming import SectionStreamer
+
+SECTIONS = ("intro", "trees", "credits")
+
+HEADER = "#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:{}\n#EXT-X-MEDIA-SEQUENCE:0\n#EXT-X-PLAYLIST-TYPE:EVENT\n"
+
+
+# Writes a section playlist the way ffmpeg's hls muxer would
+def write_section(output_dir, index: int, name: str, version: int, durations: list):
+    section_dir = output_dir / f"{index:02d}_{name}"
+    section_dir.mkdir(exist_ok=True)
+
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for number, duration in enumerate(durations):
+        lines += [f"#EXTINF:{duration},", f"v{version}_{number:03d}.ts"]
+        (section_dir / f"v{version}_{number:03d}.ts").write_bytes(b"")
+    lines.append("#EXT-X-ENDLIST")
+
+    (section_dir / "index.m3u8").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_playlist_lists_ready_sections_with_discontinuities(tmp_path):
+    write_section(tmp_path, 0, "intro", 1, [4.0, 1.5])
+    write_section(tmp_path, 1, "trees", 1, [4.2])
+
+    streamer = SectionStreamer(tmp_path, SECTIONS, rendering=set())
+    streamer.write_playlist(finished=True)
+
+    assert streamer.playlist.read_text(encoding="utf-8") == HEADER.format(5) + (
+        "#EXTINF:4.0,\n00_intro/v1_000.ts\n"
+        "#EXTINF:1.5,\n00_intro/v1_001.ts\n"
+        "#EXT-X-DISCONTINUITY\n"
+        "#EXTINF:4.2,\n01_trees/v1_000.ts\n"
+        "#EXT-X-ENDLIST\n"
+    )
+
+
+def test_playlist_stops_at_sections_being_rendered(tmp_path):
+    write_section(tmp_path, 0, "intro", 1, [4.0])
+    write_section(tmp_path, 1, "trees", 1, [4.0])
+    write_section(tmp_path, 2, "credits", 1, [4.0])
+
+    # The old segments of a section being re-rendered are held back, along with everything after them
+    streamer = SectionStreamer(tmp_path, SECTIONS, rendering={"trees"})
+    streamer.write_playlist(finished=False)
+
+    assert streamer.playlist.read_text(encoding="utf-8") == HEADER.format(4) + "#EXTINF:4.0,\n00_intro/v1_000.ts\n"
+
+
+def test_playlist_skips_sections_that_were_never_rendered(tmp_path):
+    write_section(tmp_path, 0, "intro", 1, [4.0])
+    write_section(tmp_path, 2, "credits", 1, [3.0])
+
+    streamer = SectionStreamer(tmp_path, SECTIONS, rendering=set())
+    streamer.write_playlist(finished=True)
+
+    assert streamer.playlist.read_text(encoding="utf-8") == HEADER.format(4) + (
+        "#EXTINF:4.0,\n00_intro/v1_000.ts\n"
+        "#EXT-X-DISCONTINUITY\n"
+        "#EXTINF:3.0,\n02_credits/v1_000.ts\n"
+        "#EXT-X-ENDLIST\n"
+    )
+
+
+def test_every_render_writes_a_new_playlist(tmp_path):
+    first = SectionStreamer(tmp_path, SECTIONS, rendering=set())
+    first.close()
+    second = SectionStreamer(tmp_path, SECTIONS, rendering=set())
+    second.close()
+
+    assert first.playlist.name == "MainScene_1.m3u8"
+    assert second.playlist.name == "MainScene_2.m3u8"
+    assert first.playlist.exists()
+
+
+def test_old_playlists_and_their_segments_are_removed(tmp_path):
+    write_section(tmp_path, 0, "intro", 1, [4.0])
+    write_section(tmp_path, 1, "trees", 1, [4.0])
+    SectionStreamer(tmp_path, SECTIONS, rendering=set()).close()
+
+    # Each later render replaces the trees section, keeping the earlier segments for the older playlists
+    for version in (2, 3):
+        streamer = SectionStreamer(tmp_path, SECTIONS, rendering={"trees"})
+        write_section(tmp_path, 1, "trees", version, [4.0])
+        streamer.rendering.discard("trees")
+        streamer.close()
+
+    assert sorted(path.name for path in tmp_path.glob("*.m3u8")) == ["MainScene_2.m3u8", "MainScene_3.m3u8"]
+    assert sorted(path.name for path in (tmp_path / "01_trees").glob("*.ts")) == ["v2_000.ts", "v3_000.ts"]
+    assert (tmp_path / "00_intro" / "v1_000.ts").exists()
+
+
+def test_empty_section_is_left_out_instead_of_its_old_segments(tmp_path):
+    write_section(tmp_path, 0, "intro", 1, [4.0])
+    write_section(tmp_path, 1, "trees", 1, [4.0])
+    write_section(tmp_path, 2, "credits", 1, [4.0])
+
+    streamer = SectionStreamer(tmp_path, SECTIONS, rendering={"trees"})
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    streamer.encode("trees", [], None, work_dir)
+    streamer.close()
+
+    assert not work_dir.exists()
+    assert streamer.playlist.read_text(encoding="utf-8") == HEADER.format(4) + (
+        "#EXTINF:4.0,\n00_intro/v1_000.ts\n"
+        "#EXT-X-DISCONTINUITY\n"
+        "#EXTINF:4.0,\n02_credits/v1_000.ts\n"
+        "#EXT-X-ENDLIST\n"
+    )
@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import importlib
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import traceback
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from manim import tempconfig
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+from manim_voiceover.services.gtts import GTTSService
+
+import main
+from dirty_region import DirtyRegionCamera
+from fingerprint import section_fingerprints
+from streaming import find_ffmpeg
+
+SOURCE = Path("main.py")
+IMAGES = Path("images")
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>MainScene preview</title></head>
+<body style="background: #222; color: #eee; font-family: sans-serif">
+{stream}
+{videos}
+<script>
+    // Reloads the page whenever the daemon finishes a render
+    let version = "{version}";
+    setInterval(async () => {{
+        const latest = await (await fetch("version.txt", {{cache: "no-store"}})).text();
+        if (latest !== version) location.reload();
+    }}, 1000);
+</script>
+</body>
+</html>
+"""
+
+
+# Modification times of every file the daemon watches, used to notice when something was saved
+def snapshot() -> dict:
+    files = [SOURCE] + sorted(path for path in IMAGES.rglob("*") if path.is_file())
+    return {path: path.stat().st_mtime_ns for path in files}
+
+
+def write_index(preview_dir: Path, version: str, playlist: Path):
+    videos = "\n".join(
+        f'<h3>{section}</h3>\n<video controls width="854" src="{section}.mp4?v={version}"></video>'
+        for section in main.SECTIONS
+        if (preview_dir / f"{section}.mp4").exists()
+    )
+
+    # Each render writes a new playlist, so the link has to follow the latest one
+    stream = ""
+    if playlist is not None:
+        link = playlist.resolve().relative_to(preview_dir.resolve()).as_posix()
+        stream = f'<p>HLS stream: <a href="{link}">{playlist.name}</a></p>'
+
+    (preview_dir / "index.html").write_text(
+        INDEX_PAGE.format(stream=stream, videos=videos, version=version), encoding="utf-8"
+    )
+    (preview_dir / "version.txt").write_text(version, encoding="utf-8")
+
+
+class PreviewFileWriter(SceneFileWriter):
+    # The preview only uses the section videos, and the whole movie would lay the full voiceover over just the
+    # rendered sections, so it isn't combined
+    def combine_to_movie(self):
+        pass
+
+
+# Section videos are combined without audio, so the section's voiceover is added back for the preview
+def write_preview(video: Path, audio, output: Path):
+    if audio is None:
+        shutil.copyfile(video, output)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        audio_file = Path(work_dir) / "audio.wav"
+        muxed = Path(work_dir) / output.name
+        audio.export(audio_file, format="wav")
+
+        subprocess.run([
+            find_ffmpeg(), "-y", "-loglevel", "error",
+            "-i", str(video), "-i", str(audio_file),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac",
+            str(muxed),
+        ], check=True)
+        shutil.move(str(muxed), output)
+
+
+# Returns the path of the HLS playlist written by this render, if streaming
+def render(sections: set, speech_service: GTTSService, preview_dir: Path, stream_dir: Path):
+    main.MainScene.preloaded_speech_service = speech_service
+    main.MainScene.sections = sections
+    if stream_dir is not None:
+        main.MainScene.stream_dir = str(stream_dir)
+
+    with tempconfig({"quality": "low_quality", "save_sections": True, "preview": False}):
+        scene = main.MainScene(
+            renderer=CairoRenderer(file_writer_class=PreviewFileWriter, camera_class=DirtyRegionCamera)
+        )
+        scene.render()
+
+        file_writer = scene.renderer.file_writer
+        for section in file_writer.sections:
+            if section.name in sections and section.video is not None:
+                write_preview(
+                    file_writer.sections_output_dir / section.video,
+                    scene.section_audio(section.name),
+                    preview_dir / f"{section.name}.mp4"
+                )
+
+    if scene.streamer is not None:
+        return scene.streamer.playlist
+    return None
+
+
+class PreviewRequestHandler(SimpleHTTPRequestHandler):
+    # Open previews poll version.txt every second, so only errors are logged to keep the render output readable
+    def log_request(self, code="-", size="-"):
+        pass
+
+
+def serve(preview_dir: Path, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("localhost", port), partial(PreviewRequestHandler, directory=str(preview_dir)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main_loop():
+    parser = argparse.ArgumentParser(description="Re-renders the sections of main.py that change while it's edited")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks for saved files")
+    parser.add_argument("--preview-dir", type=Path, default=Path("media/preview"))
+    parser.add_argument(
+        "--stream-dir", type=Path,
+        help="also keep an HLS stream of the video up to date here, must be inside --preview-dir so it gets served"
+    )
+    args = parser.parse_args()
+
+    if args.stream_dir is not None and args.preview_dir.resolve() not in args.stream_dir.resolve().parents:
+        parser.error("--stream-dir must be inside --preview-dir")
+
+    args.preview_dir.mkdir(parents=True, exist_ok=True)
+    serve(args.preview_dir, args.port)
+    print(f"Serving preview at http://localhost:{args.port}/index.html")
+
+    # Loaded once, the transcription model stays in memory between renders
+    speech_service = GTTSService(transcription_model="base")
+    rendered = {}
+    last_snapshot = None
+    playlist = None
+
+    while True:
+        try:
+            current = snapshot()
+        except OSError:
+            # A file was replaced or removed while listing them, so try again on the next check
+            time.sleep(args.interval)
+            continue
+
+        if current != last_snapshot:
+            last_snapshot = current
+
+            try:
+                # Picks up the saved code without paying for the manim and speech imports again
+                importlib.reload(main)
+                fingerprints = section_fingerprints(SOURCE, main.SECTIONS)
+                changed = {section for section, value in fingerprints.items() if rendered.get(section) != value}
+
+                if changed:
+                    print(f"Rendering {', '.join(s for s in main.SECTIONS if s in changed)}")
+                    start = time.perf_counter()
+                    playlist = render(changed, speech_service, args.preview_dir, args.stream_dir) or playlist
+                    rendered.update({section: fingerprints[section] for section in changed})
+                    version = hashlib.sha1(str(sorted(rendered.items())).encode()).hexdigest()
+                    write_index(args.preview_dir, version, playlist)
+                    print(f"Done in {time.perf_counter() - start:.1f}s")
+            except Exception:
+                # Keep watching, the next save will probably fix it
+                traceback.print_exc()
+
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main_loop()